@@ -1,6 +1,33 @@
 #!/usr/bin/env python3
+import errno
 import os
-import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from copy_utils import MAX_COPY_WORKERS, fast_copy
+
+def link_or_copy(src_path, dst_path):
+    """Hard-link src to dst, replacing dst; fall back to fast_copy where links are not possible."""
+    # Remove dst first so a fallback copy never truncates a file still linked to src
+    if os.path.lexists(dst_path):
+        os.unlink(dst_path)
+    try:
+        os.link(src_path, dst_path)
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP):
+            raise
+        fast_copy(src_path, dst_path)
+
+def copy_batch(pairs, link=False):
+    """Copy (or hard-link) each (src, dst) pair concurrently and return the list of destination names."""
+    copy_file = link_or_copy if link else fast_copy
+    
+    def copy_one(pair):
+        src_path, dst_path = pair
+        copy_file(src_path, dst_path)
+        return dst_path
+    
+    with ThreadPoolExecutor(max_workers=MAX_COPY_WORKERS) as executor:
+        return list(executor.map(copy_one, pairs))
 
 def main():
     """Copy all renamed textures to the main directory."""
@@ -11,17 +38,17 @@ def main():
         print(f"Error: Source directory '{source_dir}' does not exist.")
         return
     
-    # Get list of texture files
-    texture_files = [f for f in os.listdir(source_dir) if f.endswith(".png")]
-    print(f"Found {len(texture_files)} texture files to copy.")
+    # Get list of texture files (scandir already yields the joined source path)
+    with os.scandir(source_dir) as it:
+        pairs = [(entry.path, entry.name) for entry in it if entry.name.endswith((".png", ".jpg"))]
+    print(f"Found {len(pairs)} texture files to copy.")
     
-    # Copy each file
-    for filename in texture_files:
-        src_path = os.path.join(source_dir, filename)
-        dst_path = filename  # Copy to current directory
-        
-        shutil.copy2(src_path, dst_path)
-        print(f"Copied {filename}")
+    # Copy all files in one batch to the current directory; on the same filesystem
+    # a hard link only updates directory entries and moves no texture data
+    same_filesystem = os.stat(source_dir).st_dev == os.stat(".").st_dev
+    copied = copy_batch(pairs, link=same_filesystem)
+    if copied:
+        print("\n".join(f"Copied {filename}" for filename in copied))
     
     print("\nDone! All texture files copied to the main directory.")
     print("\nNow you can use the ValeroWA02C_updated.mtl file (or rename it to ValeroWA02C.mtl)")
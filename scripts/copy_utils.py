@@ -0,0 +1,58 @@
+"""Shared file copy helpers for update_mtl_and_textures.py and copy_textures.py."""
+import errno
+import os
+import sys
+import shutil
+
+# Copies are I/O-bound, so keep several in flight at once
+MAX_COPY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Only Linux allows sendfile between two regular files
+USE_SENDFILE = sys.platform.startswith('linux')
+
+# Keep Windows from translating line endings on raw fds
+O_BINARY = getattr(os, "O_BINARY", 0)
+
+def fast_copy(src_path, dst_path):
+    """
+    Copy a file in-kernel where possible, keeping permissions and timestamps like shutil.copy2.
+
+    Tries copy_file_range, then sendfile (Linux only), then a plain shutil.copyfileobj.
+    """
+    src_fd = os.open(src_path, os.O_RDONLY | O_BINARY)
+    try:
+        st = os.fstat(src_fd)
+        dst_fd = os.open(dst_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | O_BINARY, 0o666)
+        try:
+            remaining = st.st_size
+            use_copy_file_range = hasattr(os, "copy_file_range")
+            while remaining > 0:
+                if use_copy_file_range:
+                    try:
+                        copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                    except OSError as e:
+                        if e.errno not in (errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP):
+                            raise
+                        use_copy_file_range = False
+                        continue
+                    # Some filesystems report 0 instead of failing; retry those with the fallbacks
+                    if copied == 0 and remaining == st.st_size:
+                        use_copy_file_range = False
+                        continue
+                elif USE_SENDFILE:
+                    copied = os.sendfile(dst_fd, src_fd, None, remaining)
+                else:
+                    # Portable fallback: copy the rest through Python buffers from the current offsets
+                    with open(src_fd, 'rb', closefd=False) as src, open(dst_fd, 'wb', closefd=False) as dst:
+                        shutil.copyfileobj(src, dst)
+                    break
+                if copied == 0:
+                    raise EOFError(f"Unexpected end of file while copying {src_path}")
+                remaining -= copied
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+    os.chmod(dst_path, st.st_mode & 0o7777)
+    os.utime(dst_path, ns=(st.st_atime_ns, st.st_mtime_ns))
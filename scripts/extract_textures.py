@@ -1,88 +1,234 @@
 #!/usr/bin/env python3
 import os
+import sys
+import json
+import mmap
 import base64
-from pygltflib import GLTF2
+import struct
+import binascii
+from concurrent.futures import ThreadPoolExecutor
+
+GLB_MAGIC = b'glTF'
+CHUNK_TYPE_JSON = 0x4E4F534A
+CHUNK_TYPE_BIN = 0x004E4942
+
+# Data URIs are decoded in slices of this many characters
+BASE64_CHUNK_SIZE = 1024 * 1024
+
+# Every byte outside the base64 alphabet; b64decode skips these too (e.g. line wrapping)
+NON_BASE64_BYTES = bytes(set(range(256)) - set(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="))
+
+# Image writes are I/O-bound, so keep several in flight at once
+MAX_WRITE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Only Linux allows sendfile between two regular files
+USE_SENDFILE = sys.platform.startswith('linux')
+
+def read_glb_header(f):
+    """Parse the GLB header and JSON chunk; return (gltf dict, BIN chunk offset, BIN chunk length)."""
+    magic, version, length = struct.unpack('<4sII', f.read(12))
+    if magic != GLB_MAGIC:
+        raise ValueError("Not a GLB file (bad magic)")
+
+    json_length, json_type = struct.unpack('<II', f.read(8))
+    if json_type != CHUNK_TYPE_JSON:
+        raise ValueError("First GLB chunk is not JSON")
+    gltf = json.loads(f.read(json_length))
+
+    # The optional BIN chunk follows the JSON chunk
+    bin_header_offset = 12 + 8 + json_length
+    if bin_header_offset + 8 <= length:
+        f.seek(bin_header_offset)
+        bin_length, bin_type = struct.unpack('<II', f.read(8))
+        if bin_type == CHUNK_TYPE_BIN:
+            return gltf, bin_header_offset + 8, bin_length
+    return gltf, None, 0
+
+def write_all(fd, data):
+    """Write the whole buffer to fd with os.write."""
+    while data:
+        written = os.write(fd, data)
+        data = data[written:]
+
+def sendfile_all(out_fd, in_fd, offset, count):
+    """Copy count bytes starting at offset of in_fd to out_fd in-kernel."""
+    while count > 0:
+        sent = os.sendfile(out_fd, in_fd, offset, count)
+        if sent == 0:
+            raise EOFError("Unexpected end of GLB file")
+        offset += sent
+        count -= sent
+
+def write_base64(f, b64data):
+    """Decode base64 text into an open binary file one chunk at a time."""
+    pending = b""
+    for pos in range(0, len(b64data), BASE64_CHUNK_SIZE):
+        chunk = pending + b64data[pos:pos + BASE64_CHUNK_SIZE].encode('ascii').translate(None, NON_BASE64_BYTES)
+        # Decode whole 4-character groups only and carry the rest into the next slice
+        usable = len(chunk) - len(chunk) % 4
+        f.write(binascii.a2b_base64(chunk[:usable]))
+        pending = chunk[usable:]
+    if pending:
+        f.write(binascii.a2b_base64(pending))
+
+def write_base64_file(path, b64data):
+    """Decode base64 text into a new file, removing the partial file if decoding fails."""
+    f = open(path, 'wb')
+    try:
+        with f:
+            write_base64(f, b64data)
+    except Exception:
+        os.remove(path)
+        raise
+
+def write_buffer_image(glb_fd, dir_fd, output_dir, job):
+    """Open, write and close one queued buffer view image and return the progress message."""
+    i, filename, buffer_data, start, end, file_offset, buffer_view_index = job
+    path = filename if dir_fd is not None else os.path.join(output_dir, filename)
+    try:
+        # Each fd lives only as long as its own write, so at most MAX_WRITE_WORKERS are open
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666, dir_fd=dir_fd)
+        try:
+            if USE_SENDFILE and file_offset is not None:
+                sendfile_all(fd, glb_fd, file_offset, end - start)
+            else:
+                # Slice the image out of the buffer without copying it
+                with memoryview(buffer_data)[start:end] as img_data:
+                    write_all(fd, img_data)
+        finally:
+            os.close(fd)
+    except Exception as e:
+        return f"Error extracting image {i}: {e}"
+    return f"Extracted {filename} from buffer view {buffer_view_index}"
+
+def write_buffer_images(jobs, glb_fd, output_dir):
+    """Write queued buffer view images concurrently and return a progress message per image index."""
+    # Open the output directory once so every file name resolves relative to it
+    dir_fd = None
+    if os.open in os.supports_dir_fd:
+        dir_fd = os.open(output_dir, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WRITE_WORKERS) as executor:
+            futures = {job[0]: executor.submit(write_buffer_image, glb_fd, dir_fd, output_dir, job) for job in jobs}
+        return {i: future.result() for i, future in futures.items()}
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
 
 def extract_textures_from_glb(glb_file, output_dir):
     """Extract texture images from a GLB file to the specified output directory."""
     print(f"Loading GLB file: {glb_file}")
-    gltf = GLTF2.load(glb_file)
-    
+    with open(glb_file, 'rb') as glb, mmap.mmap(glb.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        gltf, bin_offset, bin_length = read_glb_header(glb)
+        extract_images(gltf, glb.fileno(), mm, bin_offset, bin_length, os.path.dirname(glb_file), output_dir)
+
+def extract_images(gltf, glb_fd, mm, bin_offset, bin_length, base_dir, output_dir):
+    """Write every image of a parsed GLB; BIN chunk images go straight from the GLB file or its mapping."""
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-    
+
     # Check if there are embedded textures (binary buffers)
-    if not hasattr(gltf, 'buffers') or not gltf.buffers:
+    buffers = gltf.get('buffers')
+    if not buffers:
         print("No buffers found in the GLB file.")
         return
-    
+
     # Process all images
-    if not hasattr(gltf, 'images') or not gltf.images:
+    images = gltf.get('images')
+    if not images:
         print("No images found in the GLB file.")
         return
-    
-    print(f"Found {len(gltf.images)} images in the GLB file.")
-    
-    for i, image in enumerate(gltf.images):
-        try:
-            # Get the image data
-            if hasattr(image, 'uri') and image.uri:
-                # Handle data URIs
-                if image.uri.startswith('data:'):
-                    content_type, b64data = image.uri.split(',', 1)
-                    img_data = base64.b64decode(b64data)
-                    extension = content_type.split('/')[-1].split(';')[0]
-                    filename = f"texture_{i}.{extension}"
-                    with open(os.path.join(output_dir, filename), 'wb') as f:
-                        f.write(img_data)
-                    print(f"Extracted {filename} from data URI")
-                    
-                # Handle file URIs
+
+    print(f"Found {len(images)} images in the GLB file.")
+
+    buffer_views = gltf.get('bufferViews', [])
+    buffer_cache = {}
+    pending_writes = []
+    # Progress messages are collected per image index and printed in image order at the end
+    messages = {}
+
+    def get_buffer_data(index):
+        # Buffers without a URI live in the GLB BIN chunk; others are data URIs or external files
+        if index not in buffer_cache:
+            uri = buffers[index].get('uri')
+            if not uri:
+                if bin_offset is None:
+                    buffer_cache[index] = None
                 else:
-                    filename = image.uri
-                    print(f"Image {i} references external file: {filename}")
-                    
-            # Handle buffer views
-            elif hasattr(image, 'bufferView') and image.bufferView is not None:
-                buffer_view = gltf.bufferViews[image.bufferView]
-                buffer = gltf.buffers[buffer_view.buffer]
-                
-                # Get the binary data from the gltf object
-                # The binary_blob is a bytes object, not a method
-                buffer_data = gltf.get_data_from_buffer_uri(buffer.uri) if hasattr(buffer, 'uri') and buffer.uri else gltf.binary_blob
-                
-                if buffer_data is None:
-                    print(f"Could not get binary data for image {i}")
-                    continue
-                
-                # Extract the image data from the buffer
-                start = buffer_view.byteOffset if hasattr(buffer_view, 'byteOffset') else 0
-                length = buffer_view.byteLength
-                end = start + length
-                img_data = buffer_data[start:end]
-                
-                # Determine the file extension based on mimeType
-                extension = "bin"
-                if hasattr(image, 'mimeType'):
-                    if image.mimeType == "image/jpeg":
+                    buffer_cache[index] = memoryview(mm)[bin_offset:bin_offset + bin_length]
+            elif uri.startswith('data:'):
+                buffer_cache[index] = base64.b64decode(uri.split(',', 1)[1])
+            else:
+                with open(os.path.join(base_dir, uri), 'rb') as f:
+                    buffer_cache[index] = f.read()
+        return buffer_cache[index]
+
+    try:
+        for i, image in enumerate(images):
+            try:
+                uri = image.get('uri')
+                # Get the image data
+                if uri:
+                    # Handle data URIs
+                    if uri.startswith('data:'):
+                        content_type, b64data = uri.split(',', 1)
+                        extension = content_type.split('/')[-1].split(';')[0]
+                        filename = f"texture_{i}.{extension}"
+                        write_base64_file(os.path.join(output_dir, filename), b64data)
+                        messages[i] = f"Extracted {filename} from data URI"
+
+                    # Handle file URIs
+                    else:
+                        filename = uri
+                        messages[i] = f"Image {i} references external file: {filename}"
+
+                # Handle buffer views
+                elif image.get('bufferView') is not None:
+                    buffer_view = buffer_views[image['bufferView']]
+                    buffer_data = get_buffer_data(buffer_view['buffer'])
+
+                    if buffer_data is None:
+                        messages[i] = f"Could not get binary data for image {i}"
+                        continue
+
+                    # Locate the image within the buffer
+                    start = buffer_view.get('byteOffset', 0)
+                    end = start + buffer_view['byteLength']
+
+                    # Determine the file extension based on mimeType
+                    extension = "bin"
+                    mime_type = image.get('mimeType')
+                    if mime_type == "image/jpeg":
                         extension = "jpg"
-                    elif image.mimeType == "image/png":
+                    elif mime_type == "image/png":
                         extension = "png"
-                    elif image.mimeType == "image/webp":
+                    elif mime_type == "image/webp":
                         extension = "webp"
-                
-                # Write the image file
-                filename = f"texture_{i}.{extension}"
-                with open(os.path.join(output_dir, filename), 'wb') as f:
-                    f.write(img_data)
-                print(f"Extracted {filename} from buffer view {image.bufferView}")
-        except Exception as e:
-            print(f"Error extracting image {i}: {e}")
-    
+
+                    # Queue the image file; all buffer view images are written in one batch below
+                    filename = f"texture_{i}.{extension}"
+                    # BIN chunk images can be sent directly from their offset in the GLB file
+                    file_offset = None
+                    if not buffers[buffer_view['buffer']].get('uri'):
+                        file_offset = bin_offset + start
+                    pending_writes.append((i, filename, buffer_data, start, end, file_offset, image['bufferView']))
+            except Exception as e:
+                messages[i] = f"Error extracting image {i}: {e}"
+
+        messages.update(write_buffer_images(pending_writes, glb_fd, output_dir))
+    finally:
+        # Views into the mapping must be released before it can be closed
+        for data in buffer_cache.values():
+            if isinstance(data, memoryview):
+                data.release()
+
+    for i in sorted(messages):
+        print(messages[i])
+
     print("\nTexture extraction complete. Check the extracted_textures directory.")
 
 if __name__ == "__main__":
     glb_file = "ValeroRefinery.glb"
     output_dir = "extracted_textures"
-    
-    extract_textures_from_glb(glb_file, output_dir) 
\ No newline at end of file
+
+    extract_textures_from_glb(glb_file, output_dir)
@@ -2,6 +2,9 @@ import sys
 import os
 import bpy
 
+# Packed image formats that are written to disk as-is, and their file extensions
+PACKED_FILE_EXTENSIONS = {'PNG': 'png', 'JPEG': 'jpg'}
+
 def extract_textures():
     # Directory to save extracted textures
     output_dir = os.path.join(os.path.dirname(bpy.data.filepath), "extracted_textures")
@@ -31,14 +34,20 @@ def extract_textures():
                     print(f"  Image {image.name} is not packed, skipping")
                     continue
                 
-                # Generate a filename for the texture
-                texture_filename = f"{image.name}.png"
+                # Generate a filename for the texture, keeping the packed format's extension
+                extension = PACKED_FILE_EXTENSIONS.get(image.file_format, "png")
+                texture_filename = f"{image.name}.{extension}"
                 texture_path = os.path.join(output_dir, texture_filename)
                 
                 # Save the image if it doesn't already exist
                 if not os.path.exists(texture_path):
                     print(f"  Saving texture: {texture_filename}")
-                    image.save_render(texture_path)
+                    if image.file_format in PACKED_FILE_EXTENSIONS:
+                        # The packed data is already a complete image file, so skip the re-encode
+                        with open(texture_path, 'wb') as f:
+                            f.write(bytes(image.packed_file.data))
+                    else:
+                        image.save_render(texture_path)
                     texture_count += 1
     
     print(f"Extraction complete. {texture_count} textures extracted to {output_dir}")
@@ -1,7 +1,47 @@
 #!/usr/bin/env python3
 import os
 import re
+import mmap
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from copy_utils import MAX_COPY_WORKERS, fast_copy
+
+# Texture file types produced by extract_textures_blender.py, in lookup order
+TEXTURE_EXTENSIONS = (".png", ".jpg")
+
+# Matches every "newmtl <name>" and "illum ..." line, including its line ending (LF or CRLF) if any
+MTL_STATEMENT_RE = re.compile(rb'^(?:newmtl[ \t]+(\S+)|illum)[^\r\n]*(\r?\n)?', re.M)
+
+def read_mtl(mtl_file):
+    """
+    Scan an MTL file once through an mmap.
+    
+    Returns the material names, the file split after every illum line as
+    (text, material, line_ending, ends_with_newline) tuples, and the text after the last split.
+    """
+    materials = []
+    segments = []
+    with open(mtl_file, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return materials, segments, b""
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mtl_data:
+            current_material = None
+            line_ending = b"\n"
+            last = 0
+            for match in MTL_STATEMENT_RE.finditer(mtl_data):
+                # Follow the file's own line endings for any inserted lines
+                if match.group(2):
+                    line_ending = match.group(2)
+                if match.group(1) is not None:
+                    current_material = os.fsdecode(match.group(1))
+                    materials.append(current_material)
+                elif current_material is not None:
+                    segments.append((mtl_data[last:match.end()], current_material, line_ending, bool(match.group(2))))
+                    last = match.end()
+            tail = mtl_data[last:]
+    return materials, segments, tail
 
 def main():
     """
@@ -14,38 +54,34 @@ def main():
     mtl_file = "ValeroRefinery.mtl"
     texture_dir = "extracted_textures"
     
-    # Get all material names from MTL file
+    # Get all material names from MTL file, keeping it split after each illum line
+    # so the rewrite below needs no second pass over the file
     print("Reading materials from MTL file...")
-    materials = []
-    with open(mtl_file, 'r') as f:
-        for line in f:
-            if line.startswith("newmtl"):
-                material_name = line.strip().split()[1]
-                materials.append(material_name)
+    materials, mtl_segments, mtl_tail = read_mtl(mtl_file)
     
     print(f"Found {len(materials)} materials in MTL file")
     
-    # Get all textures
-    textures = [f for f in os.listdir(texture_dir) if f.endswith(".png")]
-    textures.sort()
-    print(f"Found {len(textures)} textures in {texture_dir}")
+    # Get all textures, keyed by name; scandir already gives us the joined path
+    with os.scandir(texture_dir) as it:
+        texture_paths = {entry.name: entry.path for entry in it if entry.name.endswith(TEXTURE_EXTENSIONS)}
+    print(f"Found {len(texture_paths)} textures in {texture_dir}")
     
     # Create a mapping between materials and textures
-    # Material_0.1000 should map to Image_0.1000.png
+    # Material_0.1000 should map to Image_0.1000.png (or Image_0.1000.jpg)
     material_texture_map = {}
     
     for material in materials:
         # Extract the number from material name (e.g., "Material_0.1000" -> "0.1000")
-        match = re.search(r'Material_(.+)', material)
-        if match:
-            material_suffix = match.group(1)
+        if material.startswith("Material_"):
+            material_suffix = material.removeprefix("Material_")
             # Look for corresponding texture file
-            expected_texture = f"Image_{material_suffix}.png"
-            if expected_texture in textures:
+            candidates = [f"Image_{material_suffix}{extension}" for extension in TEXTURE_EXTENSIONS]
+            expected_texture = next((name for name in candidates if name in texture_paths), None)
+            if expected_texture:
                 material_texture_map[material] = expected_texture
                 print(f"Mapped {material} -> {expected_texture}")
             else:
-                print(f"Warning: No texture found for material {material} (expected {expected_texture})")
+                print(f"Warning: No texture found for material {material} (expected {' or '.join(candidates)})")
     
     print(f"Successfully mapped {len(material_texture_map)} materials to textures")
     
@@ -57,32 +93,38 @@ def main():
     
     # Rename and copy textures
     print("Renaming and copying textures...")
-    for material, original_texture in material_texture_map.items():
-        src_path = os.path.join(texture_dir, original_texture)
-        new_texture_name = f"{material}.png"
+    def copy_texture(item):
+        material, original_texture = item
+        # Only textures found by the scan above are mapped, so the source is known to exist
+        src_path = texture_paths[original_texture]
+        new_texture_name = material + os.path.splitext(original_texture)[1]
         dst_path = os.path.join(renamed_dir, new_texture_name)
         
-        if os.path.exists(src_path):
-            shutil.copy2(src_path, dst_path)
-            print(f"Copied {original_texture} -> {new_texture_name}")
-        else:
-            print(f"Warning: Source texture not found: {src_path}")
+        fast_copy(src_path, dst_path)
+        return f"Copied {original_texture} -> {new_texture_name}"
+    
+    # Copy concurrently, then report in material order
+    with ThreadPoolExecutor(max_workers=MAX_COPY_WORKERS) as executor:
+        for message in executor.map(copy_texture, material_texture_map.items()):
+            print(message)
     
     # Update MTL file
     print("Updating MTL file with texture references...")
     updated_mtl_file = mtl_file.replace(".mtl", "_updated.mtl")
     
-    with open(mtl_file, 'r') as infile, open(updated_mtl_file, 'w') as outfile:
-        current_material = None
-        for line in infile:
-            outfile.write(line)
-            
-            if line.startswith("newmtl"):
-                current_material = line.strip().split()[1]
-            elif line.startswith("illum") and current_material in material_texture_map:
-                # Add map_Kd reference after illum line
-                texture_name = f"{current_material}.png"
-                outfile.write(f"map_Kd {texture_name}\n")
+    pieces = []
+    for text, material, line_ending, ends_with_newline in mtl_segments:
+        pieces.append(text)
+        if material in material_texture_map:
+            # Add map_Kd reference after illum line
+            if not ends_with_newline:
+                pieces.append(line_ending)
+            texture_name = material + os.path.splitext(material_texture_map[material])[1]
+            pieces.append(b"map_Kd %s%s" % (os.fsencode(texture_name), line_ending))
+    pieces.append(mtl_tail)
+    
+    with open(updated_mtl_file, 'wb') as outfile:
+        outfile.write(b"".join(pieces))
     
     print(f"Updated MTL file saved as: {updated_mtl_file}")
     print(f"Renamed textures saved in: {renamed_dir}")